@@ -1,6 +1,10 @@
 import asyncio
 import os
 import boto3
+try:
+    import uvloop  # Bucle de eventos más rápido (no disponible en Windows)
+except ImportError:
+    uvloop = None
 from nova_sonic_class_streaming import SimpleNovaSonicStreaming
 
 async def main():
@@ -63,7 +67,10 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        if uvloop:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("\\n🛑 Demo interrumpido por el usuario")
     except Exception as e:
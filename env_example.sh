@@ -13,6 +13,9 @@ ENVIRONMENT=production
 DEFAULT_VOICE_ID=lupe
 MAX_SESSIONS=100
 SESSION_TIMEOUT=3600
+TTS_POOL_SIZE=4
+TTS_POOL_IDLE_TIMEOUT=300
+RESPONSE_TIMEOUT=10
 
 # Logging
 LOG_LEVEL=INFO
\ No newline at end of file
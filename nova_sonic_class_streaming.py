@@ -1,42 +1,148 @@
 import asyncio
 import base64
-import json
-import uuid
+import binascii
+import collections
+import concurrent.futures
+import itertools
+import re
+import threading
+import orjson
 import pyaudio
 from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
 from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
 from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
 from smithy_aws_core.credentials_resolvers.environment import EnvironmentCredentialsResolver
 
+# Matches the base64 audio payload of an audioOutput event without a full JSON parse
+_AUDIO_CONTENT_RE = re.compile(rb'"content":"([A-Za-z0-9+/=]+)"')
+
+# Initialization events, serialized once. Per-session values are filled into the
+# %(name)s slots by SimpleNovaSonicStreaming._build_initialization_payloads.
+_INIT_EVENT_TEMPLATES = tuple(orjson.dumps(event) for event in (
+    # 1. SessionStart
+    {
+        "event": {
+            "sessionStart": {
+                "inferenceConfiguration": {
+                    "maxTokens": 1024,
+                    "topP": 0.95,
+                    "temperature": 0.7
+                }
+            }
+        }
+    },
+    # 2. PromptStart
+    {
+        "event": {
+            "promptStart": {
+                "promptName": "%(prompt_name)s",
+                "audioOutputConfiguration": {
+                    "mediaType": "audio/lpcm",
+                    "sampleRateHertz": 24000,
+                    "sampleSizeBits": 16,
+                    "channelCount": 1,
+                    "voiceId": "%(voice_id)s",
+                    "encoding": "base64",
+                    "audioType": "SPEECH"
+                }
+            }
+        }
+    },
+    # 3. ContentStart (SYSTEM)
+    {
+        "event": {
+            "contentStart": {
+                "promptName": "%(prompt_name)s",
+                "contentName": "%(content_name)s",
+                "type": "TEXT",
+                "role": "SYSTEM",
+                "interactive": True,
+                "textInputConfiguration": {
+                    "mediaType": "text/plain"
+                }
+            }
+        }
+    },
+    # 4. TextInput (SYSTEM)
+    {
+        "event": {
+            "textInput": {
+                "promptName": "%(prompt_name)s",
+                "contentName": "%(content_name)s",
+                "content": "You are a helpful voice assistant. Greet the user and wait for their question."
+            }
+        }
+    },
+    # 5. ContentEnd (SYSTEM)
+    {
+        "event": {
+            "contentEnd": {
+                "promptName": "%(prompt_name)s",
+                "contentName": "%(content_name)s"
+            }
+        }
+    },
+))
+
+# Prompt/content names only need to be unique within a stream, so a counter suffices
+_NAME_COUNTER = itertools.count()
+
+# Bedrock clients shared by every session with the same region, AWS profile and credentials resolver
+_SHARED_CLIENTS = {}
+_SHARED_CLIENTS_LOCK = threading.Lock()
+
 class SimpleNovaSonicStreaming:
     """Clase simplificada para Nova Sonic con streaming bidireccional"""
 
-    def __init__(self, voice_id="matthew", aws_profile=None, region="us-east-1"):
+    def __init__(self, voice_id="matthew", aws_profile=None, region="us-east-1", use_local_audio=True,
+                 credentials_resolver=None):
         # Audio configuration
         self.rate = 16000  # Input sample rate
         self.output_rate = 24000  # Output sample rate
         self.chunk = 1024
+        self.max_audio_batch = 6  # Max queued chunks coalesced per audioInput event (~192 ms)
+        self.max_audio_queue = 32  # Max pending input chunks (~2 s) before new ones are dropped
         self.format = pyaudio.paInt16
         self.channels = 1
         self.voice_id = voice_id
         self.region = region
+        self.aws_profile = aws_profile
+        self.credentials_resolver = credentials_resolver  # Defaults to AWS_* environment variables
 
         # Streaming components
         self.bedrock_client = None
         self.stream_response = None
         self.is_active = False
 
-        # Audio queues
-        self.audio_input_queue = asyncio.Queue()
-        self.audio_output_queue = asyncio.Queue()
+        # Audio queues. Input is fed from the PortAudio thread, so it uses a deque
+        # plus an event signalled thread-safely instead of an asyncio.Queue.
+        self._audio_ring = collections.deque()
+        self._audio_wake = asyncio.Event()
+        self._audio_wake_pending = False
+        self._audio_drops = 0
+        self._audio_drops_reported = 0
+        self._loop = None
+        self.audio_output_queue = asyncio.Queue(maxsize=8)  # Bounded so playback back-pressures the response pump
+
+        # Futures waiting for the next audio response, and the reply audio collected so far.
+        # _process_responses resolves the oldest future when the assistant's audio block ends.
+        self._pending_responses = collections.deque()
+        self._response_audio = bytearray()
+
+        # Reusable audioInput payload buffers, keyed by total payload size
+        self._payload_pool = {}
+        self._payload_sizes = set()
 
         # Session information
-        self.prompt_name = str(uuid.uuid4())
-        self.content_name = str(uuid.uuid4())
-        self.audio_content_name = str(uuid.uuid4())
-
-        # PyAudio
-        self.p = pyaudio.PyAudio()
+        self.prompt_name = f"prompt-{next(_NAME_COUNTER):x}"
+        self.content_name = f"content-{next(_NAME_COUNTER):x}"
+        self.audio_content_name = f"audio-{next(_NAME_COUNTER):x}"
+        self._init_payloads = self._build_initialization_payloads()
+
+        # PyAudio (only needed when audio comes from the local microphone/speakers)
+        self.p = pyaudio.PyAudio() if use_local_audio else None
+        # PortAudio writes are serialized on their own thread, away from the default executor
+        self._audio_exec = concurrent.futures.ThreadPoolExecutor(max_workers=1) if use_local_audio else None
         self.input_stream = None
         self.output_stream = None
 
@@ -44,17 +150,24 @@ class SimpleNovaSonicStreaming:
         self._initialize_client()
 
     def _initialize_client(self):
-        """Initialize the Bedrock client for streaming."""
+        """Initialize the Bedrock client for streaming, reusing a shared client when possible."""
+        # A client signs with the resolver it was built with (the environment resolver
+        # caches the first credentials it reads), so never share across profiles or resolvers
+        key = (self.region, self.aws_profile, self.credentials_resolver)
         try:
-            config = Config(
-                endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
-                region=self.region,
-                aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
-                http_auth_scheme_resolver=HTTPAuthSchemeResolver(),
-                http_auth_schemes={"aws.auth#sigv4": SigV4AuthScheme()}
-            )
-            self.bedrock_client = BedrockRuntimeClient(config=config)
-            print("✅ Bedrock streaming client initialized")
+            with _SHARED_CLIENTS_LOCK:
+                client = _SHARED_CLIENTS.get(key)
+                if client is None:
+                    config = Config(
+                        endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
+                        region=self.region,
+                        aws_credentials_identity_resolver=self.credentials_resolver or EnvironmentCredentialsResolver(),
+                        http_auth_scheme_resolver=HTTPAuthSchemeResolver(),
+                        http_auth_schemes={"aws.auth#sigv4": SigV4AuthScheme()}
+                    )
+                    client = _SHARED_CLIENTS[key] = BedrockRuntimeClient(config=config)
+                    print("✅ Bedrock streaming client initialized")
+            self.bedrock_client = client
         except Exception as e:
             print(f"❌ Error initializing Bedrock client: {e}")
 
@@ -64,11 +177,27 @@ class SimpleNovaSonicStreaming:
             self._initialize_client()
 
         try:
+            self._loop = asyncio.get_running_loop()
             self.stream_response = await self.bedrock_client.invoke_model_with_bidirectional_stream(
                 InvokeModelWithBidirectionalStreamOperationInput(model_id='amazon.nova-sonic-v1:0')
             )
             self.is_active = True
 
+            # Pre-build the audioInput envelope; only the base64 content varies per event
+            self._audio_prefix_bytes = (
+                '{"event":{"audioInput":{"promptName":"%s","contentName":"%s","content":"'
+                % (self.prompt_name, self.audio_content_name)
+            ).encode('utf-8')
+            self._audio_suffix_bytes = b'"}}}'
+
+            # Microphone batches are whole chunks, so their payload sizes are known up front
+            envelope_size = len(self._audio_prefix_bytes) + len(self._audio_suffix_bytes)
+            chunk_bytes = self.chunk * self.channels * 2
+            self._payload_sizes = {
+                envelope_size + 4 * ((n * chunk_bytes + 2) // 3)
+                for n in range(1, self.max_audio_batch + 1)
+            }
+
             # Send initialization events
             await self._send_initialization_events()
 
@@ -86,94 +215,34 @@ class SimpleNovaSonicStreaming:
             print(f"❌ Failed to initialize stream: {str(e)}")
             raise
 
-    async def _send_initialization_events(self):
-        """Send initialization events to Nova Sonic."""
-
-        # 1. SessionStart
-        session_start = {
-            "event": {
-                "sessionStart": {
-                    "inferenceConfiguration": {
-                        "maxTokens": 1024,
-                        "topP": 0.95,
-                        "temperature": 0.7
-                    }
-                }
-            }
+    def _build_initialization_payloads(self):
+        """Fill the pre-serialized initialization events with this session's values."""
+        values = {
+            b"prompt_name": orjson.dumps(self.prompt_name)[1:-1],
+            b"content_name": orjson.dumps(self.content_name)[1:-1],
+            b"voice_id": orjson.dumps(self.voice_id)[1:-1],
         }
-        await self._send_raw_event(json.dumps(session_start))
-        await asyncio.sleep(0.1)
+        return [template % values for template in _INIT_EVENT_TEMPLATES]
 
-        # 2. PromptStart
-        prompt_start = {
-            "event": {
-                "promptStart": {
-                    "promptName": self.prompt_name,
-                    "audioOutputConfiguration": {
-                        "mediaType": "audio/lpcm",
-                        "sampleRateHertz": 24000,
-                        "sampleSizeBits": 16,
-                        "channelCount": 1,
-                        "voiceId": self.voice_id,
-                        "encoding": "base64",
-                        "audioType": "SPEECH"
-                    }
-                }
-            }
-        }
-        await self._send_raw_event(json.dumps(prompt_start))
-        await asyncio.sleep(0.1)
+    async def _send_initialization_events(self):
+        """Send initialization events to Nova Sonic.
 
-        # 3. ContentStart (SYSTEM)
-        content_start_system = {
-            "event": {
-                "contentStart": {
-                    "promptName": self.prompt_name,
-                    "contentName": self.content_name,
-                    "type": "TEXT",
-                    "role": "SYSTEM",
-                    "interactive": True,
-                    "textInputConfiguration": {
-                        "mediaType": "text/plain"
-                    }
-                }
-            }
-        }
-        await self._send_raw_event(json.dumps(content_start_system))
-        await asyncio.sleep(0.1)
+        Each send completes before the next starts, so the stream keeps them in order.
+        """
+        for payload in self._init_payloads:
+            await self._send_raw_event_bytes(payload)
 
-        # 4. TextInput (SYSTEM)
-        system_message = {
-            "event": {
-                "textInput": {
-                    "promptName": self.prompt_name,
-                    "contentName": self.content_name,
-                    "content": "You are a helpful voice assistant. Greet the user and wait for their question."
-                }
-            }
-        }
-        await self._send_raw_event(json.dumps(system_message))
-        await asyncio.sleep(0.1)
-
-        # 5. ContentEnd (SYSTEM)
-        content_end_system = {
-            "event": {
-                "contentEnd": {
-                    "promptName": self.prompt_name,
-                    "contentName": self.content_name
-                }
-            }
-        }
-        await self._send_raw_event(json.dumps(content_end_system))
-        await asyncio.sleep(0.1)
+    async def _send_raw_event(self, event):
+        """Serialize an event dict and send it to the Bedrock stream."""
+        await self._send_raw_event_bytes(orjson.dumps(event))
 
-    async def _send_raw_event(self, event_json):
-        """Send a raw event JSON to the Bedrock stream."""
+    async def _send_raw_event_bytes(self, payload):
+        """Send an already-encoded event payload to the Bedrock stream."""
         if not self.stream_response or not self.is_active:
             return
 
         event = InvokeModelWithBidirectionalStreamInputChunk(
-            value=BidirectionalInputPayloadPart(bytes_=event_json.encode('utf-8'))
+            value=BidirectionalInputPayloadPart(bytes_=payload)
         )
 
         try:
@@ -202,7 +271,7 @@ class SimpleNovaSonicStreaming:
                 }
             }
         }
-        await self._send_raw_event(json.dumps(content_start))
+        await self._send_raw_event(content_start)
 
     async def send_audio_content_end(self):
         """Send audio content end event."""
@@ -214,50 +283,149 @@ class SimpleNovaSonicStreaming:
                 }
             }
         }
-        await self._send_raw_event(json.dumps(content_end))
+        await self._send_raw_event(content_end)
 
     def add_audio_chunk(self, audio_bytes):
-        """Add an audio chunk to the queue."""
+        """Add an audio chunk to the queue. Safe to call from any thread."""
+        # Drop rather than grow without bound if sending to Bedrock stalls
+        if len(self._audio_ring) >= self.max_audio_queue:
+            self._audio_drops += 1
+            return
+
+        self._audio_ring.append(audio_bytes)
+
+        # Wake the sender once per batch rather than once per chunk
+        if not self._audio_wake_pending and self._loop is not None:
+            self._audio_wake_pending = True
+            self._loop.call_soon_threadsafe(self._audio_wake.set)
+
+    def _get_payload(self, size):
+        """Get a reusable audioInput payload buffer, or None for non-standard sizes."""
+        if size not in self._payload_sizes:
+            return None
+
+        pool = self._payload_pool.setdefault(size, collections.deque())
+        if pool:
+            return pool.pop()
+
+        # The envelope never changes, so only the base64 content is rewritten on reuse
+        blob_size = size - len(self._audio_prefix_bytes) - len(self._audio_suffix_bytes)
+        return bytearray(self._audio_prefix_bytes + bytes(blob_size) + self._audio_suffix_bytes)
+
+    def _return_payload(self, payload):
+        """Return a payload buffer to the pool once it has been sent."""
+        self._payload_pool[len(payload)].append(payload)
+
+    def _normalize_input(self, audio_bytes, src_rate):
+        """Validate 16-bit PCM audio and resample it to the input rate Nova Sonic expects."""
+        if len(audio_bytes) % 2:
+            raise ValueError("Audio must be 16-bit PCM (even number of bytes)")
+
+        # Bound the rate so resample_poly cannot build an enormous filter
+        if not isinstance(src_rate, int) or not 8000 <= src_rate <= 192000:
+            raise ValueError(f"Sample rate must be an integer between 8000 and 192000 Hz, got {src_rate}")
+
+        if src_rate == self.rate:
+            return audio_bytes
+
+        # Imported lazily: scipy.signal takes about a second to import and only the
+        # webhook resamples
+        import numpy as np
+        from scipy.signal import resample_poly
+
+        samples = np.frombuffer(audio_bytes, dtype=np.int16)
+        resampled = resample_poly(samples, self.rate, src_rate)
+        return np.clip(np.rint(resampled), -32768, 32767).astype(np.int16).tobytes()
+
+    async def send_audio_chunk(self, audio_bytes):
+        """Send an audio chunk to Bedrock right away, bypassing the input queue."""
+        # Base64 encode the audio data and wrap it in the pre-built envelope
+        blob = binascii.b2a_base64(audio_bytes, newline=False)
+        size = len(self._audio_prefix_bytes) + len(blob) + len(self._audio_suffix_bytes)
+        payload = self._get_payload(size)
+
+        if payload is None:
+            # Non-standard size (e.g. audio posted to the webhook), use a one-off buffer
+            await self._send_raw_event_bytes(self._audio_prefix_bytes + blob + self._audio_suffix_bytes)
+            return
+
+        # Send the event from a pooled buffer
+        start = len(self._audio_prefix_bytes)
+        payload[start:start + len(blob)] = blob
         try:
-            self.audio_input_queue.put_nowait({
-                'audio_bytes': audio_bytes,
-                'prompt_name': self.prompt_name,
-                'content_name': self.audio_content_name
-            })
-        except:
-            pass  # Queue might be full
+            await self._send_raw_event_bytes(payload)
+        finally:
+            self._return_payload(payload)
 
     async def _process_audio_input(self):
         """Process audio input from the queue and send to Bedrock."""
         while self.is_active:
             try:
-                # Get audio data from the queue
-                data = await self.audio_input_queue.get()
-
-                audio_bytes = data.get('audio_bytes')
+                # Wait for audio data unless a previous batch left some behind
+                if not self._audio_ring:
+                    await self._audio_wake.wait()
+                    self._audio_wake.clear()
+                    self._audio_wake_pending = False
+
+                # Drain queued chunks so they go out in a single event
+                chunks = []
+                while self._audio_ring and len(chunks) < self.max_audio_batch:
+                    chunks.append(self._audio_ring.popleft())
+
+                drops = self._audio_drops
+                if drops != self._audio_drops_reported:
+                    print(f"⚠️ Audio input queue full, {drops - self._audio_drops_reported} chunks dropped")
+                    self._audio_drops_reported = drops
+
+                audio_bytes = b''.join(chunk for chunk in chunks if chunk)
                 if not audio_bytes:
                     continue
 
-                # Base64 encode the audio data
-                blob = base64.b64encode(audio_bytes)
-                audio_event = {
-                    "event": {
-                        "audioInput": {
-                            "promptName": self.prompt_name,
-                            "contentName": self.audio_content_name,
-                            "content": blob.decode('utf-8')
-                        }
-                    }
-                }
-
-                # Send the event
-                await self._send_raw_event(json.dumps(audio_event))
+                await self.send_audio_chunk(audio_bytes)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 print(f"❌ Error processing audio: {e}")
 
+    async def _handle_audio_output(self, audio_bytes):
+        """Collect a decoded audio chunk for any waiting caller and queue it for playback."""
+        if self._pending_responses:
+            self._response_audio += audio_bytes
+
+        # Without local audio nothing drains the playback queue
+        if self.p is not None:
+            await self._queue_for_playback(audio_bytes)
+        print("🔊 Audio chunk received from Nova Sonic")
+
+    def _finish_response_audio(self):
+        """Resolve the oldest waiting caller with the audio collected for this turn."""
+        audio = bytes(self._response_audio)
+        self._response_audio.clear()
+
+        while self._pending_responses:
+            future = self._pending_responses.popleft()
+            if not future.done():  # Skip callers that already timed out
+                future.set_result(audio)
+                break
+
+    async def _queue_for_playback(self, audio_bytes):
+        """Queue audio for playback, waiting for room while the conversation is active."""
+        try:
+            self.audio_output_queue.put_nowait(audio_bytes)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        # Playback is behind. Wait for room, but re-check is_active periodically so
+        # the response pump cannot stay blocked once playback has stopped.
+        while self.is_active:
+            try:
+                await asyncio.wait_for(self.audio_output_queue.put(audio_bytes), timeout=0.1)
+                return
+            except asyncio.TimeoutError:
+                continue
+
     async def _process_responses(self):
         """Process incoming responses from Bedrock."""
         try:
@@ -267,19 +435,28 @@ class SimpleNovaSonicStreaming:
                     result = await output[1].receive()
 
                     if result.value and result.value.bytes_:
+                        raw = result.value.bytes_
+
+                        # Fast path: audioOutput events only need their content field
+                        match = _AUDIO_CONTENT_RE.search(raw) if b'"audioOutput"' in raw else None
+                        if match:
+                            await self._handle_audio_output(base64.b64decode(match.group(1)))
+                            continue
+
                         try:
-                            response_data = result.value.bytes_.decode('utf-8')
-                            json_data = json.loads(response_data)
+                            json_data = orjson.loads(raw)
 
                             # Handle different response types
                             if 'event' in json_data:
                                 if 'audioOutput' in json_data['event']:
                                     audio_content = json_data['event']['audioOutput']['content']
-                                    audio_bytes = base64.b64decode(audio_content)
-                                    await self.audio_output_queue.put(audio_bytes)
-                                    print("🔊 Audio chunk received from Nova Sonic")
+                                    await self._handle_audio_output(base64.b64decode(audio_content))
+                                elif 'contentEnd' in json_data['event']:
+                                    # The assistant's audio block is over, hand the reply to the caller
+                                    if json_data['event']['contentEnd'].get('type') == 'AUDIO' and self._response_audio:
+                                        self._finish_response_audio()
 
-                        except json.JSONDecodeError:
+                        except orjson.JSONDecodeError:
                             pass
 
                 except StopAsyncIteration:
@@ -292,9 +469,37 @@ class SimpleNovaSonicStreaming:
             print(f"❌ Response processing error: {e}")
         finally:
             self.is_active = False
+            self._stop_playback()
+            self._fail_pending_responses(ConnectionError("Nova Sonic response stream closed"))
+
+    def _discard_pending_response(self, future):
+        """Forget a caller that stopped waiting, so its late reply is not handed to the next one."""
+        try:
+            self._pending_responses.remove(future)
+        except ValueError:
+            pass
+        self._response_audio.clear()
+
+    def _fail_pending_responses(self, error):
+        """Fail every caller still waiting for a reply, e.g. once the stream has ended."""
+        self._response_audio.clear()
+        while self._pending_responses:
+            future = self._pending_responses.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    def _stop_playback(self):
+        """Wake the playback task so it notices the stream has stopped."""
+        # Discard one pending chunk if needed so the sentinel always fits
+        if self.audio_output_queue.full():
+            self.audio_output_queue.get_nowait()
+        self.audio_output_queue.put_nowait(None)
 
     def setup_audio_streams(self):
         """Setup PyAudio streams for input and output."""
+        if self.p is None:
+            return
+
         try:
             # Input stream
             self.input_stream = self.p.open(
@@ -306,13 +511,14 @@ class SimpleNovaSonicStreaming:
                 stream_callback=self._input_callback
             )
 
-            # Output stream
+            # Output stream, with a buffer covering the same duration as the input one
+            # (1536 frames at 24 kHz = 1024 frames at 16 kHz = 64 ms) so both wake in step
             self.output_stream = self.p.open(
                 format=self.format,
                 channels=self.channels,
                 rate=self.output_rate,
                 output=True,
-                frames_per_buffer=self.chunk
+                frames_per_buffer=self.chunk * self.output_rate // self.rate
             )
 
             print("✅ Audio streams setup complete")
@@ -329,22 +535,35 @@ class SimpleNovaSonicStreaming:
 
     async def play_output_audio(self):
         """Play audio responses from Nova Sonic."""
+        if self.p is None:
+            return
+
         while self.is_active:
             try:
-                # Get audio data from the queue
-                audio_data = await asyncio.wait_for(
-                    self.audio_output_queue.get(),
-                    timeout=0.1
-                )
+                # Get audio data from the queue; None is the shutdown sentinel
+                audio_data = await self.audio_output_queue.get()
+                if audio_data is None:
+                    break
 
-                if audio_data and self.is_active and self.output_stream:
+                # Fuse chunks that queued up during the previous write into one write
+                chunks = [audio_data]
+                stopping = False
+                while not self.audio_output_queue.empty():
+                    audio_data = self.audio_output_queue.get_nowait()
+                    if audio_data is None:
+                        stopping = True
+                        break
+                    chunks.append(audio_data)
+
+                if self.is_active and self.output_stream:
                     # Write audio data to output stream
                     await asyncio.get_event_loop().run_in_executor(
-                        None, self.output_stream.write, audio_data
+                        self._audio_exec, self.output_stream.write, b''.join(chunks)
                     )
 
-            except asyncio.TimeoutError:
-                continue
+                if stopping:
+                    break
+
             except Exception as e:
                 if self.is_active:
                     print(f"❌ Error playing output audio: {str(e)}")
@@ -389,9 +608,17 @@ class SimpleNovaSonicStreaming:
 
         self.is_active = False
 
+        # Release the audio input and playback tasks if they are waiting for data
+        self._audio_wake.set()
+        self._stop_playback()
+
         # Send audio content end
         await self.send_audio_content_end()
 
+        # Let any in-flight PortAudio write finish before the output stream is closed
+        if self._audio_exec:
+            await asyncio.get_running_loop().run_in_executor(None, self._audio_exec.shutdown, True)
+
         # Stop audio streams
         if self.input_stream:
             if self.input_stream.is_active():
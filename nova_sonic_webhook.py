@@ -7,10 +7,15 @@ import asyncio
 import base64
 import json
 import uuid
+import time
 import boto3
-from typing import Optional, Dict, Any
+from collections import deque
+from typing import Optional, Dict, Any, Deque, Tuple
 import tempfile
 import wave
+from smithy_aws_core.identity import AWSCredentialsIdentity
+from smithy_core.aio.interfaces.identity import IdentityResolver
+from smithy_core.interfaces.identity import IdentityProperties
 from nova_sonic_class_streaming import SimpleNovaSonicStreaming
 
 # Configurar variables de entorno desde el inicio
@@ -18,43 +23,148 @@ AWS_PROFILE = os.getenv("AWS_PROFILE", "adrian.hidalgo")
 DEFAULT_REGION = os.getenv("AWS_DEFAULT_REGION", "us-east-1") 
 PORT = int(os.getenv("PORT", 8000))
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+TTS_POOL_SIZE = int(os.getenv("TTS_POOL_SIZE", 4))
+TTS_POOL_IDLE_TIMEOUT = int(os.getenv("TTS_POOL_IDLE_TIMEOUT", 300))
+RESPONSE_TIMEOUT = float(os.getenv("RESPONSE_TIMEOUT", 10))
 
-# Configurar AWS Profile con variables de entorno
-def setup_aws_credentials(aws_profile: str = None):
-    """Configurar credenciales AWS para el webhook"""
-    try:
-        # Si hay variables de entorno, usarlas directamente
-        if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
-            print("✅ Usando credenciales AWS de variables de entorno")
-            return True
-            
-        # Si no, intentar usar el perfil
-        profile = aws_profile or AWS_PROFILE
+class Boto3CredentialsResolver(IdentityResolver[AWSCredentialsIdentity, IdentityProperties]):
+    """Resolver de credenciales para el cliente Bedrock basado en un objeto Credentials de boto3.
+
+    boto3 renueva solo las credenciales temporales (SSO, assume-role), así que cada
+    llamada a get_identity devuelve credenciales vigentes sin reiniciar el servidor.
+    """
+
+    def __init__(self, credentials):
+        self._credentials = credentials
+
+    async def get_identity(self, *, identity_properties: IdentityProperties) -> AWSCredentialsIdentity:
+        # get_frozen_credentials puede refrescar por red, fuera del event loop
+        frozen = await asyncio.get_running_loop().run_in_executor(
+            None, self._credentials.get_frozen_credentials
+        )
+        return AWSCredentialsIdentity(
+            access_key_id=frozen.access_key,
+            secret_access_key=frozen.secret_key,
+            session_token=frozen.token
+        )
+
+# Resolvers de credenciales AWS, creados una sola vez por perfil
+credential_resolvers: Dict[str, Boto3CredentialsResolver] = {}
+
+def load_aws_credentials(profile: str):
+    """Leer las credenciales AWS de un perfil con boto3 (E/S bloqueante)"""
+    # Si hay variables de entorno, usarlas directamente; si no, el perfil
+    if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
+        session = boto3.Session()
+        print("✅ Usando credenciales AWS de variables de entorno")
+    else:
         session = boto3.Session(profile_name=profile)
-        credentials = session.get_credentials()
-        
-        os.environ['AWS_ACCESS_KEY_ID'] = credentials.access_key
-        os.environ['AWS_SECRET_ACCESS_KEY'] = credentials.secret_key
-        if credentials.token:
-            os.environ['AWS_SESSION_TOKEN'] = credentials.token
-        os.environ['AWS_DEFAULT_REGION'] = session.region_name or DEFAULT_REGION
-        
         print(f"✅ Configurado AWS profile: {profile}")
-        return True
-    except Exception as e:
-        print(f"❌ Error configurando AWS: {e}")
-        return False
+    
+    credentials = session.get_credentials()
+    if credentials is None:
+        raise RuntimeError(f"No se encontraron credenciales AWS para el perfil '{profile}'")
+    return credentials
+
+async def get_credentials_resolver(aws_profile: str = None) -> Boto3CredentialsResolver:
+    """Obtener el resolver de credenciales de un perfil, leyendo boto3 solo la primera vez"""
+    profile = aws_profile or AWS_PROFILE
+    if profile in credential_resolvers:
+        return credential_resolvers[profile]
+    
+    credentials = await asyncio.get_running_loop().run_in_executor(None, load_aws_credentials, profile)
+    # Si dos requests cargaron el mismo perfil a la vez, conservar el primero
+    return credential_resolvers.setdefault(profile, Boto3CredentialsResolver(credentials))
+
+# Pool de instancias Nova Sonic ya inicializadas para /tts, por (voice_id, region, aws_profile)
+tts_pool: Dict[Tuple[str, str, str], Deque[Tuple[float, SimpleNovaSonicStreaming]]] = {}
+tts_pool_lock = asyncio.Lock()
+tts_pool_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+async def close_tts_sessions(sessions):
+    """Cerrar instancias que salen del pool"""
+    tts_pool_stats["evictions"] += len(sessions)
+    for nova_sonic in sessions:
+        try:
+            await nova_sonic.stop_conversation()
+        except Exception as e:
+            print(f"❌ Error cerrando sesión del pool: {e}")
+
+async def acquire_tts_session(voice_id: str, region: str, aws_profile: str = None):
+    """Obtener una instancia del pool o crear una nueva si no hay ninguna disponible"""
+    key = (voice_id, region, aws_profile)
+    stale = []
+    nova_sonic = None
+
+    async with tts_pool_lock:
+        pool = tts_pool.get(key)
+        while pool:
+            _, candidate = pool.pop()
+            if candidate.is_active:
+                nova_sonic = candidate
+                break
+            stale.append(candidate)
+        tts_pool_stats["hits" if nova_sonic else "misses"] += 1
+
+    await close_tts_sessions(stale)
+    if nova_sonic:
+        return nova_sonic
+
+    nova_sonic = SimpleNovaSonicStreaming(
+        voice_id=voice_id,
+        aws_profile=aws_profile,
+        region=region,
+        use_local_audio=False,
+        credentials_resolver=await get_credentials_resolver(aws_profile)
+    )
+    await nova_sonic.initialize_stream()
+    return nova_sonic
+
+async def release_tts_session(nova_sonic: SimpleNovaSonicStreaming):
+    """Devolver una instancia al pool si sigue sana y hay espacio"""
+    key = (nova_sonic.voice_id, nova_sonic.region, nova_sonic.aws_profile)
+    async with tts_pool_lock:
+        pool = tts_pool.setdefault(key, deque())
+        if nova_sonic.is_active and len(pool) < TTS_POOL_SIZE:
+            pool.append((time.monotonic(), nova_sonic))
+            return
+
+    await close_tts_sessions([nova_sonic])
+
+async def cleanup_idle_tts_sessions():
+    """Cerrar periódicamente las instancias del pool sin uso reciente"""
+    while True:
+        await asyncio.sleep(min(60, TTS_POOL_IDLE_TIMEOUT))
+        now = time.monotonic()
+        expired = []
+        async with tts_pool_lock:
+            for pool in tts_pool.values():
+                # Las más antiguas están a la izquierda
+                while pool and now - pool[0][0] > TTS_POOL_IDLE_TIMEOUT:
+                    expired.append(pool.popleft()[1])
+        await close_tts_sessions(expired)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Eventos del ciclo de vida del servidor"""
     # Startup
     print("🚀 Iniciando Nova Sonic Webhook Server...")
-    setup_aws_credentials()
+    try:
+        await get_credentials_resolver()
+    except Exception as e:
+        print(f"❌ Error configurando AWS: {e}")
+    # Precargar scipy (~1 s) aquí y no en el primer request que necesite remuestrear
+    import scipy.signal
+    cleanup_task = asyncio.create_task(cleanup_idle_tts_sessions())
     print(f"✅ Servidor listo para {ENVIRONMENT}")
     yield
     # Shutdown
     print("🛑 Cerrando servidor...")
+    cleanup_task.cancel()
+    async with tts_pool_lock:
+        pooled = [nova_sonic for pool in tts_pool.values() for _, nova_sonic in pool]
+        tts_pool.clear()
+    await close_tts_sessions(pooled)
 
 app = FastAPI(
     title="Nova Sonic Webhook API", 
@@ -89,6 +199,7 @@ class AudioMessage(BaseModel):
     audio_base64: str
     session_id: str
     voice_id: Optional[str] = "lupe"
+    sample_rate: Optional[int] = 16000  # Frecuencia del audio PCM 16-bit mono enviado
 
 # Almacén de sesiones activas
 active_sessions: Dict[str, SimpleNovaSonicStreaming] = {}
@@ -146,30 +257,27 @@ async def text_to_speech(request: VoiceRequest):
     Uso desde n8n: POST /tts con {"text": "Hola mundo", "voice_id": "lupe"}
     """
     try:
-        # Configurar AWS
-        setup_aws_credentials(request.aws_profile)
-        
-        # Crear instancia de Nova Sonic
-        nova_sonic = SimpleNovaSonicStreaming(
+        # Obtener instancia de Nova Sonic del pool (o crear una con stream inicializado)
+        nova_sonic = await acquire_tts_session(
             voice_id=request.voice_id,
-            aws_profile=request.aws_profile,
-            region=request.region
+            region=request.region,
+            aws_profile=request.aws_profile
         )
         
-        # Inicializar stream
-        await nova_sonic.initialize_stream()
-        
-        # Enviar texto para conversión
-        # Aquí necesitarías adaptar el código para enviar texto directamente
-        # Por ahora retornamos confirmación
-        
-        return {
-            "status": "success",
-            "message": "Texto procesado por Nova Sonic",
-            "text": request.text,
-            "voice_id": request.voice_id,
-            "audio_url": None  # Aquí iría la URL del audio generado
-        }
+        try:
+            # Enviar texto para conversión
+            # Aquí necesitarías adaptar el código para enviar texto directamente
+            # Por ahora retornamos confirmación
+            
+            return {
+                "status": "success",
+                "message": "Texto procesado por Nova Sonic",
+                "text": request.text,
+                "voice_id": request.voice_id,
+                "audio_url": None  # Aquí iría la URL del audio generado
+            }
+        finally:
+            await release_tts_session(nova_sonic)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en TTS: {str(e)}")
@@ -183,14 +291,13 @@ async def start_conversation(request: ConversationStart):
     try:
         session_id = str(uuid.uuid4())
         
-        # Configurar AWS
-        setup_aws_credentials(request.aws_profile)
-        
-        # Crear instancia de Nova Sonic
+        # Crear instancia de Nova Sonic con las credenciales del perfil
         nova_sonic = SimpleNovaSonicStreaming(
             voice_id=request.voice_id,
             aws_profile=request.aws_profile,
-            region=request.region
+            region=request.region,
+            use_local_audio=False,
+            credentials_resolver=await get_credentials_resolver(request.aws_profile)
         )
         
         # Inicializar stream
@@ -227,28 +334,54 @@ async def send_audio_message(request: AudioMessage):
         
         nova_sonic = active_sessions[request.session_id]
         
-        # Decodificar audio
-        audio_bytes = base64.b64decode(request.audio_base64)
+        # Decodificar audio y normalizarlo a PCM 16-bit a 16 kHz
+        # (en un hilo, para no bloquear el event loop que comparten todas las sesiones)
+        try:
+            audio_bytes = await asyncio.to_thread(
+                nova_sonic._normalize_input,
+                base64.b64decode(request.audio_base64),
+                request.sample_rate
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Audio inválido: {str(e)}")
+        
+        # Si el stream ya terminó no llegará ninguna respuesta
+        if not nova_sonic.is_active:
+            raise HTTPException(status_code=502, detail="El stream de Nova Sonic está cerrado")
         
         # Enviar audio content start
         await nova_sonic.send_audio_content_start()
         
-        # Procesar audio
-        nova_sonic.add_audio_chunk(audio_bytes)
+        # Registrar la espera antes de enviar el audio para no perder la respuesta
+        response_future = asyncio.get_running_loop().create_future()
+        nova_sonic._pending_responses.append(response_future)
         
-        # Esperar respuesta (esto necesitaría ser mejorado para capturar la respuesta real)
-        await asyncio.sleep(1)  # Placeholder
+        # Enviar el audio directamente, para que salga antes del content end
+        await nova_sonic.send_audio_chunk(audio_bytes)
         
         # Enviar audio content end
         await nova_sonic.send_audio_content_end()
         
+        # Esperar la respuesta completa en audio de Nova Sonic
+        try:
+            response_audio = await asyncio.wait_for(response_future, timeout=RESPONSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Descartar la espera y el audio parcial para no mezclarlos con el próximo turno
+            nova_sonic._discard_pending_response(response_future)
+            raise HTTPException(status_code=504, detail="Nova Sonic no respondió a tiempo")
+        except ConnectionError as e:
+            # El stream terminó o falló mientras esperábamos
+            raise HTTPException(status_code=502, detail=f"Error en el stream de Nova Sonic: {str(e)}")
+        
         return {
             "status": "success",
             "session_id": request.session_id,
             "message": "Audio procesado",
-            "response_audio": None  # Aquí iría el audio de respuesta en base64
+            "response_audio": base64.b64encode(response_audio).decode('utf-8')
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error procesando audio: {str(e)}")
 
@@ -285,7 +418,11 @@ async def list_active_sessions():
     """
     return {
         "active_sessions": len(active_sessions),
-        "session_ids": list(active_sessions.keys())
+        "session_ids": list(active_sessions.keys()),
+        "tts_pool": {
+            "pooled": sum(len(pool) for pool in tts_pool.values()),
+            **tts_pool_stats
+        }
     }
 
 # Endpoint para subir archivo de audio
@@ -320,6 +457,7 @@ if __name__ == "__main__":
         "nova_sonic_webhook:app", 
         host="0.0.0.0", 
         port=PORT, 
+        loop="auto",  # uvloop cuando está instalado (Linux/macOS), asyncio en Windows
         reload=(ENVIRONMENT == "development"),
         log_level="info"
     )
\ No newline at end of file